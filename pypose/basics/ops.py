@@ -1,4 +1,4 @@
-import math, torch
+import torch, operator
 
 
 def pm(input, *, out=None):
@@ -32,9 +32,15 @@ def cumops_(input, dim, ops):
     '''
     L, v = input.shape[dim], input
     assert dim != -1 or dim != v.shape[-1], "Invalid dim"
-    for i in torch.pow(2, torch.arange(math.log2(L)+1, device=v.device, dtype=torch.int64)):
-        index = torch.arange(i, L, device=v.device, dtype=torch.int64)
-        v.index_copy_(dim, index, ops(v.index_select(dim, index), v.index_select(dim, index-i)))
+    if ops is torch.add or ops is operator.add:
+        return v.cumsum_(dim)
+    i = 1
+    while i < L:
+        # operands are sliced from a copy, so that v can be written in place
+        # without modifying tensors that ops may have saved for backward
+        c = v.clone()
+        v.narrow(dim, i, L - i).copy_(ops(c.narrow(dim, i, L - i), c.narrow(dim, 0, L - i)))
+        i *= 2
     return v
 
 
@@ -74,6 +80,8 @@ def cumops(input, dim, ops):
         - The users are supposed to provide meaningful operation.
         - This function doesn't check whether the results are valid for mathematical
           definition of LieTensor, e.g., quaternion.
+        - If :obj:`ops` is :obj:`torch.add` or :obj:`operator.add`, :obj:`torch.cumsum` is
+          called directly.
         - The time complexity of the function is :math:`\mathcal{O}(\log N)`, where
           :math:`N` is the LieTensor size along the :obj:`dim` dimension.
 
@@ -1,7 +1,6 @@
 import torch, warnings
 from torch import Tensor, nn
 from torch.autograd import grad
-from torch.autograd.functional import jacobian
 
 
 class FastTriggs(nn.Module):
@@ -68,7 +67,16 @@ class FastTriggs(nn.Module):
     '''
     def __init__(self, kernel):
         super().__init__()
-        self.func = lambda x: kernel(x).sum()
+        self.kernel = kernel
+
+    def compute_grads(self, R):
+        x = R.square().sum(-1, keepdim=True).detach()
+        if hasattr(self.kernel, 'derivative'):
+            return self.kernel.derivative(x)
+        # The kernel is applied elementwise, so the gradient of its sum is its derivative.
+        with torch.enable_grad():
+            x.requires_grad_(True)
+            return grad(self.kernel(x).sum(), x)[0].detach_()
 
     def forward(self, R: Tensor, J: Tensor):
         r'''
@@ -84,8 +92,7 @@ class FastTriggs(nn.Module):
             function is not supposed to be directly called by PyPose users. It will be called
             internally by optimizers such as :meth:`pypose.optim.GN` and :meth:`pypose.optim.LM`.
         '''
-        x = R.square().sum(-1, keepdim=True)
-        s = jacobian(self.func, x).sqrt()
+        s = self.compute_grads(R).sqrt()
         sj = s.expand_as(R).reshape(-1, 1)
         return s * R, sj * J
 
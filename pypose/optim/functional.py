@@ -1,6 +1,7 @@
 import torch
-from .. import hasnan
+from .. import hasnan, LieTensor
 from functools import partial
+from torch.utils._pytree import tree_map
 from torch.autograd.functional import jacobian
 from torch.func import jacrev, jacfwd, functional_call
 
@@ -126,6 +127,10 @@ def modjac(model, input=None, create_graph=False, strict=False, vectorize=False,
         >>> J.shape
         torch.Size([8, 6])
     '''
+    if flatten:
+        return ModelJacobian(model, create_graph=create_graph, strict=strict, \
+                             vectorize=vectorize, strategy=strategy)(input)[0]
+
     params, buffers = dict(model.named_parameters()), dict(model.named_buffers())
     params_names, params_values = params.keys(), tuple(params.values())
 
@@ -141,15 +146,109 @@ def modjac(model, input=None, create_graph=False, strict=False, vectorize=False,
 
     assert not hasnan(J), 'Jacobian contains Nan! Check your model and input!'
 
-    if flatten and isinstance(J, tuple):
-        if any(isinstance(j, tuple) for j in J):
-            J = torch.cat([torch.cat([j.view(-1, p.numel()) \
-                    for j, p in zip(Jr, params_values)], dim=1) for Jr in J])
+    return J
+
+
+class ModelJacobian(object):
+    r'''
+    The flattened model Jacobian specialized for a fixed model.
+
+    Everything that does not change across calls, i.e., the parameter names, the parameter
+    sizes and shapes, and the LieTensor types to restore, is resolved once at construction,
+    so that each call only concatenates the current parameter values and runs the AD.
+    Calling it returns the flattened Jacobian of :meth:`modjac` together with the model output.
+    In reverse-mode AD, the output is taken from the evaluation on the primal parameters before
+    the backward passes. In forward-mode AD, ``None`` is returned as output.
+    Not supposed to be called by PyPose users.
+    '''
+    def __init__(self, model, create_graph=False, strict=False, vectorize=False, \
+                    strategy='reverse-mode'):
+        self.model, self.strategy, self.create_graph = model, strategy, create_graph
+        self.kwargs = {'create_graph': create_graph, 'strict': strict, \
+                       'vectorize': vectorize, 'strategy': strategy}
+        params = dict(model.named_parameters())
+        self.names, self.values = tuple(params.keys()), tuple(params.values())
+        self.numels = [p.numel() for p in self.values]
+        self.shapes = [p.shape for p in self.values]
+        self.ltypes = [p.ltype if isinstance(p, LieTensor) else None for p in self.values]
+        # parameters can only be concatenated into one vector if they share dtype and device
+        self.uniform = len({(p.dtype, p.device) for p in self.values}) <= 1
+
+    def evaluate(self, theta, input, buffers):
+        values = [t.view(shape) if ltype is None else LieTensor(t.view(shape), ltype=ltype) \
+                  for t, shape, ltype in zip(theta.split(self.numels), self.shapes, self.ltypes)]
+        return self.evaluate_values(values, input, buffers)
+
+    def evaluate_values(self, values, input, buffers):
+        return functional_call(self.model, (dict(zip(self.names, values)), buffers), input)
+
+    def flat_parameters(self):
+        return torch.cat([torch.Tensor.as_subclass(p, torch.Tensor).reshape(-1) \
+                          for p in self.values])
+
+    def __call__(self, input=None):
+        input = tuple() if input is None else input
+        buffers, output = dict(self.model.named_buffers()), []
+
+        def func(*values):
+            out = self.evaluate(values[0], input, buffers) if self.uniform \
+                else self.evaluate_values(values, input, buffers)
+            if self.strategy == 'reverse-mode':
+                output.append(out)
+            return out
+
+        if self.uniform:
+            # Differentiate w.r.t. a single flattened parameter vector, so that the Jacobian of
+            # each output is already a matrix and no per-parameter blocks are concatenated.
+            theta = self.flat_parameters()
+            J = jacobian(func, theta, **self.kwargs)
+            J = torch.cat([j.reshape(-1, theta.numel()) for j in J]) if isinstance(J, tuple) \
+                else J.reshape(-1, theta.numel())
         else:
-            J = torch.cat([j.view(-1, p.numel()) \
-                           for j, p in zip(J, params_values)], dim=1)
+            # Parameters of different dtypes or devices are differentiated separately in their
+            # own dtypes, and their Jacobian blocks are gathered on the first parameter device.
+            J = jacobian(func, self.values, **self.kwargs)
+            J = J if isinstance(J[0], tuple) else (J,)
+            device = self.values[0].device
+            J = torch.cat([torch.cat([j.reshape(-1, n).to(device) \
+                    for j, n in zip(Jr, self.numels)], dim=1) for Jr in J])
 
-    return J
+        assert not hasnan(J), 'Jacobian contains Nan! Check your model and input!'
+
+        if not output:
+            return J, None
+
+        return J, output[0] if self.create_graph else tree_map(torch.Tensor.detach, output[0])
+
+    def stream(self, input=None):
+        r'''
+        Evaluate the model once and return its detached output together with a function
+        ``rows(chunk)``, whose generator yields the rows of the flattened Jacobian, at most
+        ``chunk`` rows at a time, so that the full Jacobian is never materialized. Each block
+        is computed by batched reverse-mode AD through the graph of that single evaluation.
+        '''
+        assert self.uniform, 'Streaming the Jacobian requires all model parameters to ' \
+            'share the same dtype and device.'
+        input = tuple() if input is None else input
+        with torch.enable_grad():
+            theta = self.flat_parameters().detach().requires_grad_(True)
+            output = self.evaluate(theta, input, dict(self.model.named_buffers()))
+            outputs = output if isinstance(output, tuple) else (output,)
+            flat = torch.cat([torch.Tensor.as_subclass(o, torch.Tensor).reshape(-1) \
+                              for o in outputs])
+
+        def rows(chunk):
+            for i in range(0, flat.numel(), chunk):
+                k = min(chunk, flat.numel() - i)
+                with torch.enable_grad():
+                    J, = torch.autograd.grad(flat.narrow(0, i, k), theta, torch.eye(k, \
+                        dtype=flat.dtype, device=flat.device), retain_graph=True, \
+                        allow_unused=True, is_grads_batched=True)
+                J = theta.new_zeros(k, theta.numel()) if J is None else J
+                assert not hasnan(J), 'Jacobian contains Nan! Check your model and input!'
+                yield J
+
+        return tree_map(torch.Tensor.detach, output), rows
 
 
 def modjacrev(model, input, argnums=0, *, has_aux=False):
@@ -52,6 +52,15 @@ class Huber(nn.Module):
         output[~mask] = 2 * self.delta * input[~mask].sqrt() - self.delta2
         return output
 
+    def derivative(self, input: Tensor) -> Tensor:
+        '''
+        The derivative of the kernel function w.r.t. its input.
+
+        Args:
+            input (torch.Tensor): the input tensor (non-negative).
+        '''
+        return torch.where(input.sqrt() < self.delta, 1., self.delta / input.sqrt())
+
 
 class PseudoHuber(nn.Module):
     r"""The robust pseudo Huber kernel cost function.
@@ -93,6 +102,15 @@ class PseudoHuber(nn.Module):
         assert torch.all(input >= 0), 'input has to be non-negative'
         return 2 * self.delta2 * ((input/self.delta2 + 1).sqrt() - 1)
 
+    def derivative(self, input: Tensor) -> Tensor:
+        '''
+        The derivative of the kernel function w.r.t. its input.
+
+        Args:
+            input (torch.Tensor): the input tensor (non-negative).
+        '''
+        return (input/self.delta2 + 1).rsqrt()
+
 
 class Cauchy(nn.Module):
     r"""The robust Cauchy kernel cost function.
@@ -133,6 +151,15 @@ class Cauchy(nn.Module):
         assert torch.all(input >= 0), 'input has to be non-negative'
         return self.delta2 * (input/self.delta2 + 1).log()
 
+    def derivative(self, input: Tensor) -> Tensor:
+        '''
+        The derivative of the kernel function w.r.t. its input.
+
+        Args:
+            input (torch.Tensor): the input tensor (non-negative).
+        '''
+        return 1 / (input/self.delta2 + 1)
+
 
 class SoftLOne(nn.Module):
     r"""The robust SoftLOne kernel cost function.
@@ -174,6 +201,15 @@ class SoftLOne(nn.Module):
         assert torch.all(input >= 0), 'input has to be non-negative'
         return 2 * (self.delta1 * (1 / self.delta2 + input).sqrt() - 1)
 
+    def derivative(self, input: Tensor) -> Tensor:
+        '''
+        The derivative of the kernel function w.r.t. its input.
+
+        Args:
+            input (torch.Tensor): the input tensor (non-negative).
+        '''
+        return self.delta1 * (1 / self.delta2 + input).rsqrt()
+
 
 class Arctan(nn.Module):
     r"""The robust Arctan kernel cost function.
@@ -213,6 +249,15 @@ class Arctan(nn.Module):
         assert torch.all(input >= 0), 'input has to be non-negative'
         return self.delta2 * (input / self.delta2).arctan()
 
+    def derivative(self, input: Tensor) -> Tensor:
+        '''
+        The derivative of the kernel function w.r.t. its input.
+
+        Args:
+            input (torch.Tensor): the input tensor (non-negative).
+        '''
+        return 1 / ((input / self.delta2).square() + 1)
+
 
 class Tolerant(nn.Module):
     r"""The robust Tolerant kernel cost function.
@@ -257,6 +302,15 @@ class Tolerant(nn.Module):
         offset = self.b * math.log((1 + math.exp(-self.a / self.b))) # constant, no grad.
         return result - offset
 
+    def derivative(self, input: Tensor) -> Tensor:
+        '''
+        The derivative of the kernel function w.r.t. its input.
+
+        Args:
+            input (torch.Tensor): the input tensor (non-negative).
+        '''
+        return ((input-self.a) / self.b).sigmoid()
+
 
 class Scale(nn.Module):
     r"""The robust Scale kernel cost function.
@@ -295,3 +349,12 @@ class Scale(nn.Module):
             input (torch.Tensor): the input tensor (non-negative).
         '''
         return self.delta * input
+
+    def derivative(self, input: Tensor) -> Tensor:
+        '''
+        The derivative of the kernel function w.r.t. its input.
+
+        Args:
+            input (torch.Tensor): the input tensor (non-negative).
+        '''
+        return torch.full_like(input, self.delta)
@@ -1,11 +1,12 @@
 import torch
-from .. import bmv
+from .. import bmv, LieTensor
 from torch import nn, finfo
-from .functional import modjac
+from .functional import ModelJacobian
 from .strategy import TrustRegion
 from torch.optim import Optimizer
-from .solver import PINV, Cholesky
+from .solver import LSTSQ, Cholesky
 from torch.linalg import cholesky_ex
+from torch.utils._pytree import tree_map
 
 
 class Trivial(torch.nn.Module):
@@ -21,6 +22,27 @@ class Trivial(torch.nn.Module):
         return out[0] if len(out) == 1 else out
 
 
+def gram(J, out, block=512):
+    r'''
+    Computes the symmetric :math:`\mathbf{J}^T\mathbf{J}` into out by recursively splitting the
+    columns of :math:`\mathbf{J}` into halves :math:`[\mathbf{J}_1, \mathbf{J}_2]`. Only the
+    lower off-diagonal block :math:`\mathbf{J}_2^T\mathbf{J}_1` is multiplied at each level and
+    mirrored to the upper one, which takes about half of the FLOPs of a general matrix product
+    for more than ``block`` columns.
+    Not supposed to be called by PyPose users.
+    '''
+    n = J.shape[-1]
+    if n < block:
+        return torch.mm(J.T, J, out=out)
+    h = n // 2
+    J1, J2 = J[:, :h], J[:, h:]
+    gram(J1, out=out[:h, :h], block=block)
+    gram(J2, out=out[h:, h:], block=block)
+    torch.mm(J2.T, J1, out=out[h:, :h])
+    out[:h, h:].copy_(out[h:, :h].T)
+    return out
+
+
 class RobustModel(nn.Module):
     '''
     Standardize a model for least square problems with an option of square-rooting kernel.
@@ -46,7 +68,12 @@ class RobustModel(nn.Module):
             return self.model(input)
 
     def residual(self, output, target):
-        return output if target is None else output - target
+        residual = output if target is None else output - target
+        # only the subtraction needs LieTensor semantics, so the residual is returned as a plain
+        # Tensor and the subsequent ops skip the LieTensor dispatch.
+        if isinstance(residual, torch.Tensor):
+            return torch.Tensor.as_subclass(residual, torch.Tensor)
+        return residual
 
     def kernel_forward(self, module, input, output):
         # eps is to prevent grad of sqrt() from being inf
@@ -57,6 +84,9 @@ class RobustModel(nn.Module):
     def loss(self, input, target):
         output = self.model_forward(input)
         residual = self.residual(output, target)
+        if isinstance(self.kernel, Trivial):
+            # the trivial kernel is identity, so the two reductions collapse into one
+            return residual.square().sum()
         return self.kernel(residual.square().sum(-1)).sum()
 
 
@@ -65,14 +95,68 @@ class _Optimizer(Optimizer):
     Base class for all second order optimizers.
     '''
     def __init__(self, *args, **kwargs):
+        self.layouts = {}
         super().__init__(*args, **kwargs)
-    
+
+    def add_param_group(self, param_group):
+        self.layouts.clear()
+        super().add_param_group(param_group)
+
+    def param_layout(self, params, check=False):
+        r'''
+        The learnable parameters, their sizes, shapes, and flat buffer, which are cached per
+        param group. If check is ``True``, the parameters are flattened again if their data
+        were replaced after flattening, which is done once at the start of each step.
+        '''
+        layout = self.layouts.get(id(params))
+        if check and layout is not None and layout[3] is not None \
+                and [p.data_ptr() for p in layout[0]] != layout[3][1]:
+            self.layouts.pop(id(params))
+        if id(params) not in self.layouts:
+            active = [p for p in params if p.requires_grad]
+            numels, shapes = [p.numel() for p in active], [p.shape for p in active]
+            self.layouts[id(params)] = active, numels, shapes, self.flatten(active, numels)
+        return self.layouts[id(params)]
+
+    @staticmethod
+    def flatten(params, numels):
+        r'''
+        Move the parameters into one contiguous buffer and make their data views of it, so that
+        all of them are updated by a single kernel. Return ``None`` if there is only one parameter,
+        they do not share dtype and device, or any of them is a Lie group LieTensor, whose update
+        is a retraction on the manifold instead of an addition, in which case they are updated
+        one by one.
+        '''
+        if len(params) < 2 or len({(p.dtype, p.device) for p in params}) > 1 \
+                or any(isinstance(p, LieTensor) and not p.ltype.on_manifold for p in params):
+            return None
+        flat = torch.cat([torch.Tensor.as_subclass(p, torch.Tensor).detach().reshape(-1) \
+                          for p in params])
+        for p, v in zip(params, flat.split(numels)):
+            p.data = v.view(p.shape)
+        return flat, [p.data_ptr() for p in params]
+
+    def to_device(self, params, *args):
+        r'''
+        Move all tensors in args to the device of params up front, so that the Jacobian,
+        residual, and weight never meet on different devices in the linear algebra.
+        '''
+        device = params[0].device
+        # non_blocking is only safe for host-to-device copies, since a host tensor copied
+        # asynchronously from a device may be read by the CPU ops before the copy finishes.
+        return tree_map(lambda t: t.to(device, non_blocking=device.type != 'cpu') \
+                        if isinstance(t, torch.Tensor) else t, args)
+
     def update_parameter(self, params, step):
         r'''
         params will be updated by calling this function
         '''
-        steps = step.split([p.numel() for p in params if p.requires_grad])
-        [p.add_(d.view(p.shape)) for p, d in zip(params, steps) if p.requires_grad]
+        active, numels, shapes, flat = self.param_layout(params)
+        if flat is not None:
+            flat[0].add_(step.reshape(-1))
+            return
+        for p, d, shape in zip(active, step.split(numels), shapes):
+            p.add_(d.view(shape))
 
 
 class GaussNewton(_Optimizer):
@@ -111,8 +195,8 @@ class GaussNewton(_Optimizer):
     Args:
         model (nn.Module): a module containing learnable parameters.
         solver (nn.Module, optional): a linear solver. Available linear solvers include
-            :meth:`solver.PINV` and :meth:`solver.LSTSQ`. If ``None``, :meth:`solver.PINV` is used.
-            Default: ``None``.
+            :meth:`solver.PINV` and :meth:`solver.LSTSQ`. If ``None``, :meth:`solver.LSTSQ` is
+            used. Default: ``None``.
         kernel (nn.Module, optional): a robust kernel function. Default: ``None``.
         corrector: (nn.Module, optional): a Jacobian and model residual corrector to fit
             the kernel function. If a kernel is given but a corrector is not specified, auto
@@ -126,6 +210,14 @@ class GaussNewton(_Optimizer):
             gradient of each scalar in output with respect to the model parameters will be
             computed in parallel with ``"reverse-mode"``. More details go to
             :meth:`pypose.optim.functional.modjac`. Default: ``True``.
+        chunk (int, optional): if given, the model Jacobian is never materialized. Instead, its
+            rows are computed at most ``chunk`` at a time and folded into a running QR
+            factorization, so that the peak memory of the Jacobian drops from
+            :math:`O(mn)` to :math:`O(kn + n^2)` for :math:`m` residuals, :math:`n` parameters,
+            and :math:`k` rows per chunk. The ``solver`` is not used in this case and the
+            Jacobian is assumed to have full column rank. A ``chunk`` around the number of
+            parameters is a good choice, since the reverse-mode AD of each chunk takes
+            :math:`O(km)` memory. Default: ``None``.
 
     Available solvers: :meth:`solver.PINV`; :meth:`solver.LSTSQ`.
 
@@ -158,13 +250,24 @@ class GaussNewton(_Optimizer):
         Instead of solving :math:`\mathbf{J}^T\mathbf{J}\delta = -\mathbf{J}^T\mathbf{R}`, we solve
         :math:`\mathbf{J}\delta = -\mathbf{R}` via pseudo inversion, which is more numerically
         advisable. Therefore, only solvers with pseudo inversion (inverting non-square matrices)
-        such as :meth:`solver.PINV` and :meth:`solver.LSTSQ` are available.
+        such as :meth:`solver.PINV` and :meth:`solver.LSTSQ` are available. The default
+        :meth:`solver.LSTSQ` factorizes :math:`\mathbf{J}` with QR, which is much faster than
+        the SVD behind :meth:`solver.PINV`.
         More details are in Eq. (5) of the paper "`Robust Bundle Adjustment Revisited`_".
+
+    Note:
+        To update all learnable parameters of a param group by a single kernel, their data
+        are moved into one contiguous buffer at the first step if there are more than one of
+        them sharing dtype and device and none of them is a Lie group LieTensor, whose update
+        is a retraction, i.e., ``p.data`` of each parameter becomes a view of that buffer. The parameters themselves are not replaced, but a tensor aliasing the
+        old ``p.data`` taken before the first step no longer tracks the parameter. If
+        ``p.data`` is replaced between steps, the parameters are flattened again.
     '''
-    def __init__(self, model, solver=None, kernel=None, corrector=None, weight=None, vectorize=True):
+    def __init__(self, model, solver=None, kernel=None, corrector=None, weight=None, vectorize=True,
+                 chunk=None):
         super().__init__(model.parameters(), defaults={})
-        self.solver = PINV() if solver is None else solver
-        self.jackwargs = {'vectorize': vectorize, 'flatten': True}
+        self.solver = LSTSQ() if solver is None else solver
+        self.chunk = chunk
         if kernel is not None and corrector is None:
             # auto diff of robust model will be computed
             self.model = RobustModel(model, kernel, auto=True)
@@ -173,6 +276,7 @@ class GaussNewton(_Optimizer):
             # manually Jacobian correction will be computed
             self.model = RobustModel(model, kernel, auto=False)
             self.corrector = Trivial() if corrector is None else corrector
+        self.jacobian = ModelJacobian(self.model, vectorize=vectorize)
         self.weight = weight
 
     @torch.no_grad()
@@ -232,19 +336,47 @@ class GaussNewton(_Optimizer):
         '''
         for pg in self.param_groups:
             weight = self.weight if weight is None else weight
-            R = self.model(input, target)
-            J = modjac(self.model, input=(input, target), **self.jackwargs)
-            R, J = self.corrector(R = R, J = J)
-            A, b = J.T.reshape((-1,) + R.shape), R
-            if weight is not None:
-                A, b = (weight @ A.unsqueeze(-1)).squeeze(-1), (weight @ b.unsqueeze(-1)).squeeze(-1)
-            D = self.solver(A = A.reshape(A.shape[0], -1).T, b = -b.view(-1, 1))
+            input, target, weight = self.to_device(pg['params'], input, target, weight)
+            self.param_layout(pg['params'], check=True)
+            if self.chunk is not None:
+                D = self.streaming_solve(input, target, weight)
+            else:
+                J, R = self.jacobian(input=(input, target))
+                R, J = self.corrector(R = R, J = J)
+                A, b = J, R
+                if weight is not None:
+                    A = (weight @ J.reshape(R.shape + J.shape[-1:])).reshape(J.shape)
+                    b = (weight @ R.unsqueeze(-1)).squeeze(-1)
+                D = self.solver(A = A, b = -b.view(-1, 1))
             self.last = self.loss if hasattr(self, 'loss') \
                         else self.model.loss(input, target)
             self.update_parameter(params = pg['params'], step = D)
             self.loss = self.model.loss(input, target)
         return self.loss
 
+    def streaming_solve(self, input, target, weight):
+        r'''
+        Solve :math:`\mathbf{J}\delta = -\mathbf{R}` by folding the corrected and weighted
+        Jacobian chunk by chunk into the triangular factor of the QR factorization of
+        :math:`[\mathbf{J}, -\mathbf{R}]`, whose last column is the transformed right hand side.
+        '''
+        R, rows = self.jacobian.stream(input=(input, target))
+        d, n = R.shape[-1], sum(self.jacobian.numels)
+        if weight is not None:
+            weight = weight.expand(R.shape + R.shape[-1:]).reshape(-1, d, d)
+        R, size = R.reshape(-1, d), max(1, self.chunk // d)
+        T = R.new_zeros(0, n + 1)
+        for i, J in enumerate(rows(chunk=size * d)):
+            r, J = self.corrector(R = R[i * size:(i + 1) * size], J = J)
+            if weight is not None:
+                w = weight[i * size:(i + 1) * size]
+                J = (w @ J.reshape(r.shape + J.shape[-1:])).reshape(J.shape)
+                r = (w @ r.unsqueeze(-1)).squeeze(-1)
+            T = torch.linalg.qr(torch.cat([T, torch.cat([J, -r.reshape(-1, 1)], dim=-1)]), \
+                                mode='r').R
+        assert T.shape[0] >= n, 'Fewer residuals than parameters, the Jacobian is rank-deficient.'
+        return torch.linalg.solve_triangular(T[:n, :n], T[:n, n:], upper=True)
+
 
 class LevenbergMarquardt(_Optimizer):
     r'''
@@ -315,6 +447,14 @@ class LevenbergMarquardt(_Optimizer):
             gradient of each scalar in output with respect to the model parameters will be
             computed in parallel with ``"reverse-mode"``. More details go to
             :meth:`pypose.optim.functional.modjac`. Default: ``True``.
+        jac_dtype (torch.dtype, optional): if given, e.g., ``torch.bfloat16``, the model Jacobian
+            is stored in this reduced precision after it is computed, which reduces the memory
+            it holds and the memory traffic of the matrix products during the step, but not the
+            peak memory of computing it. It is upcast to the dtype of the model residual block
+            by block at the matrix products, so that the normal equation is accumulated, damped,
+            and solved in full precision. The strategy then receives the Jacobian in this dtype,
+            together with the product ``JD`` of the Jacobian and the step in full precision.
+            Default: ``None``.
 
     Available solvers: :meth:`solver.PINV`; :meth:`solver.LSTSQ`, :meth:`solver.Cholesky`.
 
@@ -345,17 +485,26 @@ class LevenbergMarquardt(_Optimizer):
         1, even if the model residual is a scalar. If the model output only has one dimension,
         the model Jacobian will be a row vector, instead of a matrix, which loses sample-level
         structural information, although computing Jacobian vector is faster.**
+
+    Note:
+        To update all learnable parameters of a param group by a single kernel, their data
+        are moved into one contiguous buffer at the first step if there are more than one of
+        them sharing dtype and device and none of them is a Lie group LieTensor, whose update
+        is a retraction, i.e., ``p.data`` of each parameter becomes a view of that buffer. The parameters themselves are not replaced, but a tensor aliasing the
+        old ``p.data`` taken before the first step no longer tracks the parameter. If
+        ``p.data`` is replaced between steps, the parameters are flattened again.
     '''
     def __init__(self, model, solver=None, strategy=None, kernel=None, corrector=None, \
-                       weight=None, reject=16, min=1e-6, max=1e32, vectorize=True):
+                       weight=None, reject=16, min=1e-6, max=1e32, vectorize=True, jac_dtype=None):
         assert min > 0, ValueError("min value has to be positive: {}".format(min))
         assert max > 0, ValueError("max value has to be positive: {}".format(max))
         self.strategy = TrustRegion() if strategy is None else strategy
         defaults = {**{'min':min, 'max':max}, **self.strategy.defaults}
         super().__init__(model.parameters(), defaults=defaults)
-        self.jackwargs = {'vectorize': vectorize, 'flatten': True}
         self.solver = Cholesky() if solver is None else solver
         self.reject, self.reject_count = reject, 0
+        self.A, self.b = None, None # buffers of the normal equation
+        self.jac_dtype = jac_dtype
         if kernel is not None and corrector is None:
             # auto diff of robust model will be computed
             self.model = RobustModel(model, kernel, auto=True)
@@ -364,6 +513,7 @@ class LevenbergMarquardt(_Optimizer):
             # manually Jacobian correction will be computed
             self.model = RobustModel(model, kernel, auto=False)
             self.corrector = Trivial() if corrector is None else corrector
+        self.jacobian = ModelJacobian(self.model, vectorize=vectorize)
         self.weight = weight
 
     @torch.no_grad()
@@ -435,30 +585,84 @@ class LevenbergMarquardt(_Optimizer):
         '''
         for pg in self.param_groups:
             weight = self.weight if weight is None else weight
-            R = self.model(input, target)
-            J = modjac(self.model, input=(input, target), **self.jackwargs)
+            input, target, weight = self.to_device(pg['params'], input, target, weight)
+            self.param_layout(pg['params'], check=True)
+            J, R = self.jacobian(input=(input, target))
             R, J = self.corrector(R = R, J = J)
+            if self.jac_dtype is not None:
+                J = J.to(self.jac_dtype)
             self.last = self.loss = self.loss if hasattr(self, 'loss') \
                                     else self.model.loss(input, target)
-            J_T = J.T.reshape((-1,) + R.shape)
-            if weight is not None:
-                J_T = (J_T.unsqueeze(-2) @ weight).squeeze(-2)
-            J_T = J_T.reshape(J_T.shape[0], -1)
-            A, self.reject_count = J_T @ J, 0
+            if J.dtype != R.dtype:
+                (A, b), self.reject_count = self.upcast_normal_equation(J, R, weight), 0
+            else:
+                J_T = None
+                if weight is not None:
+                    J_T = (weight.mT @ J.reshape(R.shape + J.shape[-1:])).reshape(J.shape).T
+                (A, b), self.reject_count = self.normal_equation(J, R, J_T), 0
             A.diagonal().clamp_(pg['min'], pg['max'])
             while self.last <= self.loss:
-                A.diagonal().add_(A.diagonal() * pg['damping'])
+                A.diagonal().mul_(1 + pg['damping'])
                 try:
-                    D = self.solver(A = A, b = -J_T @ R.view(-1, 1))
+                    D = self.solver(A = A, b = b)
                 except Exception as e:
                     print(e, "\nLinear solver failed. Breaking optimization step...")
                     break
                 self.update_parameter(pg['params'], D)
                 self.loss = self.model.loss(input, target)
-                self.strategy.update(pg, last=self.last, loss=self.loss, J=J, D=D, R=R.view(-1, 1))
+                # with a reduced precision J, J @ D is formed blockwise in the precision of R
+                JD = J @ D if J.dtype == R.dtype else \
+                    torch.cat([j.to(R.dtype) @ D for j in J.split(D.shape[0])])
+                self.strategy.update(pg, last=self.last, loss=self.loss, J=J, D=D, \
+                                     R=R.view(-1, 1), JD=JD)
                 if self.last < self.loss and self.reject_count < self.reject: # reject step
                     self.update_parameter(params = pg['params'], step = -D)
                     self.loss, self.reject_count = self.last, self.reject_count + 1
                 else:
                     break
         return self.loss
+
+    def normal_equation(self, J, R, J_T=None):
+        r'''
+        Computes :math:`\mathbf{A} = \mathbf{J}^T\mathbf{J}` and :math:`\mathbf{b} =
+        -\mathbf{J}^T\mathbf{R}` into buffers, which are reused as long as the number of
+        parameters, dtype, and device do not change. If the (weighted) transpose ``J_T`` is
+        not given, :math:`\mathbf{A}` is symmetric and only half of it is multiplied.
+        '''
+        A, b = self.buffers(J.shape[-1], R.dtype, J.device)
+        if J_T is None:
+            J_T = J.T
+            gram(J, out=A)
+        else:
+            torch.mm(J_T, J, out=A)
+        torch.mm(J_T, R.view(-1, 1), out=b).neg_()
+        return A, b
+
+    def upcast_normal_equation(self, J, R, weight=None):
+        r'''
+        Same as :meth:`normal_equation`, but for a reduced precision :math:`\mathbf{J}`, which
+        is upcast to the dtype of :math:`\mathbf{R}` at the GEMM boundary in blocks of whole
+        residuals of about as many rows as parameters. The weight is applied per block in the
+        same precision, so that :math:`\mathbf{A}` and :math:`\mathbf{b}` are accumulated in
+        the precision of :math:`\mathbf{R}` without a full precision copy of :math:`\mathbf{J}`.
+        '''
+        n, d = J.shape[-1], R.shape[-1]
+        A, b = self.buffers(n, R.dtype, J.device)
+        if weight is not None:
+            weight = weight.expand(R.shape + R.shape[-1:]).reshape(-1, d, d)
+        R, size = R.reshape(-1, d), max(1, n // d)
+        A.zero_(), b.zero_()
+        for i in range(0, R.shape[0], size):
+            r, j = R[i:i + size], J[i * d:(i + size) * d].to(R.dtype)
+            j_T = j.T if weight is None else \
+                (weight[i:i + size].mT @ j.reshape(r.shape + (n,))).reshape(j.shape).T
+            A.addmm_(j_T, j)
+            b.addmm_(j_T, r.reshape(-1, 1), alpha=-1)
+        return A, b
+
+    def buffers(self, n, dtype, device):
+        if self.A is None or self.A.shape[-1] != n or self.A.dtype != dtype \
+                or self.A.device != device:
+            self.A = torch.empty(n, n, dtype=dtype, device=device)
+            self.b = torch.empty(n, 1, dtype=dtype, device=device)
+        return self.A, self.b
@@ -92,7 +92,9 @@ class LSTSQ(nn.Module):
             used only when the fast model is enabled. For CPU users, the valid values are ``gels``,
             ``gelsy``, ``gelsd``, ``gelss``. For CUDA users, the only valid driver is ``gels``,
             which assumes that input matrices (:math:`\mathbf{A}`) are full-rank. If ``None``,
-            ``gelsy`` is used for CPU inputs and ``gels`` for CUDA inputs. Default: ``None``.
+            ``gels`` is used for CUDA inputs, and ``gelsy`` is used for CPU inputs, or ``gelsd``
+            if rcond is given, since setting a cut-off ratio implies that :math:`\mathbf{A}` may
+            be rank-deficient, where the SVD of ``gelsd`` is the most stable. Default: ``None``.
             To choose the best driver on CPU consider:
 
             - If input matrices (:math:`\mathbf{A}`) are well-conditioned (`condition number
@@ -109,7 +111,17 @@ class LSTSQ(nn.Module):
 
                 - But if you run into memory issues: ``gelss`` (full SVD).
 
+            - On CUDA, ``gels`` (QR without pivoting) is the fastest path for the tall and
+              skinny matrices of least squares problems, but it gives unreliable solutions for
+              rank-deficient :math:`\mathbf{A}`. Move such problems to CPU with ``gelsd``.
+
             See full description of `drivers <https://www.netlib.org/lapack/lug/node27.html>`_.
+        block (tuple of int, optional): the shape :math:`(m, n)` of the diagonal blocks if
+            :math:`\mathbf{A}` is expected to be block-diagonal, e.g., ``(6, 6)`` when each
+            :obj:`SE3` pose only affects its own 6-dimensional residual. A block-diagonal
+            :math:`\mathbf{A}` is then solved as a batch of small :math:`m \times n` problems,
+            which is much faster than solving the full matrix. If :math:`\mathbf{A}` turns out not
+            to be block-diagonal, the full matrix is solved. Default: ``None``.
 
     Note:
         This solver is faster and more numerically stable than :meth:`PINV`.
@@ -129,9 +141,9 @@ class LSTSQ(nn.Module):
                  [-0.5379],
                  [-1.2872]]])
     '''
-    def __init__(self, rcond=None, driver=None):
+    def __init__(self, rcond=None, driver=None, block=None):
         super().__init__()
-        self.rcond, self.driver = rcond, driver
+        self.rcond, self.driver, self.block = rcond, driver, block
 
     def forward(self, A: Tensor, b: Tensor) -> Tensor:
         '''
@@ -142,11 +154,38 @@ class LSTSQ(nn.Module):
         Return:
             Tensor: the solved batched tensor.
         '''
-        self.out = lstsq(A, b, rcond=self.rcond, driver=self.driver)
+        if self.block is not None:
+            x = self.block_forward(A, b)
+            if x is not None:
+                return x
+        self.out = lstsq(A, b, rcond=self.rcond, driver=self.get_driver(A))
         assert not torch.any(torch.isnan(self.out.solution)), \
             'Linear Solver Failed Using LSTSQ. Using PINV() instead'
         return self.out.solution
 
+    def get_driver(self, A: Tensor):
+        if self.driver is not None:
+            return self.driver
+        if A.is_cuda:
+            return 'gels'
+        return 'gelsy' if self.rcond is None else 'gelsd'
+
+    def block_forward(self, A: Tensor, b: Tensor):
+        # Returns None if A can not be split into diagonal blocks of the given shape.
+        (m, n), (M, N) = self.block, A.shape[-2:]
+        B = M // m
+        if B < 2 or M != B * m or N != B * n:
+            return None
+        A = A.reshape(A.shape[:-2] + (B, m, B, n))
+        D = A.diagonal(dim1=-4, dim2=-2).movedim(-1, -3)
+        if torch.count_nonzero(A) != torch.count_nonzero(D):
+            return None
+        b = b.reshape(b.shape[:-2] + (B, m, b.shape[-1]))
+        self.out = lstsq(D, b, rcond=self.rcond, driver=self.get_driver(D))
+        assert not torch.any(torch.isnan(self.out.solution)), \
+            'Linear Solver Failed Using LSTSQ. Using PINV() instead'
+        return self.out.solution.flatten(-3, -2)
+
 
 class Cholesky(nn.Module):
     r'''The batched linear solver with Cholesky decomposition.
@@ -178,6 +217,14 @@ class Cholesky(nn.Module):
     Args:
         upper (bool, optional): whether use an upper triangular matrix in Cholesky decomposition.
             Default: ``False``.
+        reuse (bool, optional): whether to reuse the last Cholesky factor. If ``True`` and the
+            :math:`N \times N` matrix :math:`\mathbf{A}` with :math:`N > 256` has changed by less
+            than 10% (relative Frobenius norm) since it was last factorized, conjugate gradient
+            preconditioned by the last factor and warm-started from the last solution is run
+            instead until the relative residual is below 1e-6, which saves the :math:`O(N^3)`
+            decomposition for slowly varying matrices, e.g., the damped normal equation of
+            :meth:`pypose.optim.LM`. A full decomposition is used if it does not converge within
+            20 iterations. Default: ``False``.
 
     Examples:
         >>> import pypose.optim.solver as ppos
@@ -193,9 +240,10 @@ class Cholesky(nn.Module):
                  [1.3725],
                  [2.6797]]])
     '''
-    def __init__(self, upper=False):
+    def __init__(self, upper=False, reuse=False):
         super().__init__()
-        self.upper = upper
+        self.upper, self.reuse = upper, reuse
+        self.A, self.L, self.x = None, None, None # last factorized matrix, factor, and solution
 
     def forward(self, A: Tensor, b: Tensor) -> Tensor:
         '''
@@ -206,7 +254,40 @@ class Cholesky(nn.Module):
         Return:
             Tensor: the solved batched tensor.
         '''
+        if self.reuse and self.reusable(A, b):
+            x = self.pcg(A, b)
+            if x is not None:
+                self.x = x
+                return x
         L, info = cholesky_ex(A, upper=self.upper)
         assert not torch.any(torch.isnan(L)), \
             'Cholesky decomposition failed. Check your matrix (may not be positive-definite)'
-        return b.cholesky_solve(L, upper=self.upper)
+        x = b.cholesky_solve(L, upper=self.upper)
+        if self.reuse:
+            # A is cloned, since callers like LM damp the same buffer in place.
+            self.A, self.L, self.x = A.clone(), L, x
+        return x
+
+    def reusable(self, A, b):
+        if A.shape[-1] <= 256 or self.A is None or self.A.shape != A.shape \
+                or self.A.dtype != A.dtype or self.A.device != A.device or self.x.shape != b.shape:
+            return False
+        change = torch.linalg.matrix_norm(A - self.A) / torch.linalg.matrix_norm(self.A)
+        return torch.all(change < 0.1)
+
+    def pcg(self, A, b, iters=20, rtol=1e-6):
+        # Returns None if the conjugate gradient does not converge within iters.
+        x, tol = self.x, rtol * torch.linalg.vector_norm(b)
+        r = b - A @ x
+        z = r.cholesky_solve(self.L, upper=self.upper)
+        p, rz = z, (r * z).sum(-2, keepdim=True)
+        for _ in range(iters):
+            if torch.linalg.vector_norm(r) <= tol:
+                return x
+            Ap = A @ p
+            alpha = rz / (p * Ap).sum(-2, keepdim=True)
+            x, r = x + alpha * p, r - alpha * Ap
+            z = r.cholesky_solve(self.L, upper=self.upper)
+            rz, rz_last = (r * z).sum(-2, keepdim=True), rz
+            p = z + rz / rz_last * p
+        return x if torch.linalg.vector_norm(r) <= tol else None
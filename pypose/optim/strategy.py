@@ -140,8 +140,10 @@ class Adaptive(object):
         self.defaults = {'damping': damping, 'high': high, 'low': low, 'up': up, 'down': down}
         self.min, self.max = min, max
 
-    def update(self, pg, last, loss, J, D, R, *args, **kwargs):
-        quality = (last - loss) / -((J @ D).mT @ (2 * R + J @ D)).squeeze()
+    def update(self, pg, last, loss, J, D, R, *args, JD=None, **kwargs):
+        # JD is the product J @ D if given, e.g., formed in full precision from a reduced J.
+        JD = J @ D if JD is None else JD
+        quality = (last - loss) / -(JD.mT @ (2 * R + JD)).squeeze()
         if quality > pg['high']:
             pg['damping'] = pg['damping'] * pg['down']
         elif quality > pg['low']:
@@ -257,8 +259,10 @@ class TrustRegion(object):
         self.defaults = {'radius':radius, 'damping':damping, 'high':high, 'low':low,
                          'up':up, 'down': down, 'factor':factor}
 
-    def update(self, pg, last, loss, J, D, R, *args, **kwargs):
-        quality = (last - loss) / -((J @ D).mT @ (2 * R + J @ D)).squeeze()
+    def update(self, pg, last, loss, J, D, R, *args, JD=None, **kwargs):
+        # JD is the product J @ D if given, e.g., formed in full precision from a reduced J.
+        JD = J @ D if JD is None else JD
+        quality = (last - loss) / -(JD.mT @ (2 * R + JD)).squeeze()
         pg['radius'] = 1. / pg['damping']
         if quality > pg['high']:
             pg['radius'] = pg['up'] * pg['radius']
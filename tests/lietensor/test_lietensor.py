@@ -185,9 +185,11 @@ def test_lietensor():
         dim = torch.randint(0, 2, (1,)).item()
         torch.testing.assert_close(x.cumsum(dim=dim), pp.cumops(x, dim, lambda a, b : a + b))
 
-    for i in range(1, 1000):
+    # lengths around powers of two cover the edge cases of the scan strides
+    for i in [1, 2, 3, 4, 5, 7, 8, 9, 15, 16, 17, 511, 512, 513, 999]:
         x = torch.randn(i, dtype=torch.float64)
         torch.testing.assert_close(x.cumsum(0), pp.cumops(x, 0, lambda a, b : a + b))
+        torch.testing.assert_close(x.cumsum(0), pp.cumops(x, 0, torch.add))
 
     x = pp.randn_SE3(2)
 
@@ -254,6 +254,42 @@ class TestOptim:
 
         assert idx < 9, "Optimization requires too many steps."
 
+    def test_optim_flat_update(self):
+
+        class PoseInv(nn.Module):
+            def __init__(self, lie, *dim):
+                super().__init__()
+                self.pose1 = pp.Parameter(lie(*dim, dtype=torch.float64))
+                self.pose2 = pp.Parameter(lie(*dim, dtype=torch.float64))
+
+            def forward(self, inputs):
+                pose1 = self.pose1.Exp() if self.pose1.ltype.on_manifold else self.pose1
+                pose2 = self.pose2.Exp() if self.pose2.ltype.on_manifold else self.pose2
+                return ((pose1 @ inputs).Log().tensor() + (pose2 @ inputs).Log().tensor())
+
+        class PerParameterGN(pp.optim.GN):
+            # the reference update applying the step to each parameter separately
+            def update_parameter(self, params, step):
+                steps = step.split([p.numel() for p in params if p.requires_grad])
+                [p.add_(d.view(p.shape)) for p, d in zip(params, steps) if p.requires_grad]
+
+        inputs = pp.randn_SE3(2, 2, dtype=torch.float64).to(device)
+        for lie, flat in [(pp.randn_SE3, False), (pp.randn_se3, True)]:
+            invnet1, invnet2 = PoseInv(lie, 2, 2).to(device), PoseInv(lie, 2, 2).to(device)
+            invnet2.load_state_dict(invnet1.state_dict())
+            optimizer1, optimizer2 = pp.optim.GN(invnet1), PerParameterGN(invnet2)
+
+            for idx in range(3):
+                optimizer1.step(inputs), optimizer2.step(inputs)
+                torch.testing.assert_close(invnet1.pose1, invnet2.pose1)
+                torch.testing.assert_close(invnet1.pose2, invnet2.pose2)
+                layout = optimizer1.param_layout(optimizer1.param_groups[0]['params'])
+                assert (layout[3] is not None) == flat, "Unexpected flattening of parameters."
+                if flat:
+                    assert invnet1.pose1.data_ptr() == layout[3][0].data_ptr()
+                    # the next step has to flatten the replaced data again
+                    invnet1.pose1.data = invnet1.pose1.data.clone()
+
     def test_optim_anybatch(self):
 
         class PoseInv(nn.Module):
@@ -282,6 +318,136 @@ class TestOptim:
 
         assert idx < 9, "Optimization requires too many steps."
 
+    def test_optim_block_solver(self):
+
+        class PoseInv(nn.Module):
+            def __init__(self, *dim):
+                super().__init__()
+                self.pose = pp.Parameter(pp.randn_se3(*dim))
+
+            def forward(self, inputs):
+                return (self.pose.Exp() @ inputs).Log().tensor()
+
+        A = torch.block_diag(*torch.randn(4, 6, 6, device=device, dtype=torch.float64))
+        b = torch.randn(24, 1, device=device, dtype=torch.float64)
+        x1 = ppos.LSTSQ()(A, b)
+        x2 = ppos.LSTSQ(block=(6, 6))(A, b)
+        torch.testing.assert_close(x1, x2)
+
+        A[0, -1] = 1 # not block-diagonal anymore
+        x1 = ppos.LSTSQ()(A, b)
+        x2 = ppos.LSTSQ(block=(6, 6))(A, b)
+        torch.testing.assert_close(x1, x2)
+
+        inputs = pp.randn_SE3(2, 2).to(device)
+        invnet = PoseInv(2, 2).to(device)
+        optimizer = pp.optim.GN(invnet, solver=ppos.LSTSQ(block=(6, 6)))
+
+        for idx in range(10):
+            loss = optimizer.step(inputs)
+            print('Pose loss %.7f @ %dit'%(loss, idx))
+            if loss < 1e-5:
+                print('Early Stoping!')
+                print('Optimization Early Done with loss:', loss.item())
+                break
+
+        assert idx < 9, "Optimization requires too many steps."
+
+    def test_optim_streaming(self):
+
+        class PoseInv(nn.Module):
+            def __init__(self, *dim):
+                super().__init__()
+                self.pose = pp.Parameter(pp.randn_se3(*dim, dtype=torch.float64))
+
+            def forward(self, inputs):
+                return (self.pose.Exp() @ inputs).Log().tensor()
+
+        inputs = pp.randn_SE3(2, 2, dtype=torch.float64).to(device)
+        weight = torch.eye(6, device=device, dtype=torch.float64) + 0.1
+        invnet1 = PoseInv(2, 2).to(device)
+        invnet2 = PoseInv(2, 2).to(device)
+        invnet2.load_state_dict(invnet1.state_dict())
+        kernel = ppok.Cauchy()
+        optimizer1 = pp.optim.GN(invnet1, kernel=kernel, corrector=ppoc.FastTriggs(kernel),
+                                 weight=weight)
+        optimizer2 = pp.optim.GN(invnet2, kernel=kernel, corrector=ppoc.FastTriggs(kernel),
+                                 weight=weight, chunk=7)
+
+        for idx in range(10):
+            loss1, loss2 = optimizer1.step(inputs), optimizer2.step(inputs)
+            print('Pose loss %.7f @ %dit'%(loss2, idx))
+            torch.testing.assert_close(loss1, loss2)
+            torch.testing.assert_close(invnet1.pose, invnet2.pose)
+            if loss2 < 1e-5:
+                print('Early Stoping!')
+                print('Optimization Early Done with loss:', loss2.item())
+                break
+
+        assert idx < 9, "Optimization requires too many steps."
+
+    def test_optim_gram(self):
+        from pypose.optim.optimizer import gram
+        J = torch.randn(1200, 1100, device=device, dtype=torch.float64)
+        A = gram(J, out=J.new_empty(1100, 1100))
+        torch.testing.assert_close(A, J.T @ J)
+
+    def test_optim_jac_dtype(self):
+
+        class PoseInv(nn.Module):
+            def __init__(self, *dim):
+                super().__init__()
+                self.pose = pp.Parameter(pp.randn_se3(*dim, dtype=torch.float64))
+
+            def forward(self, inputs):
+                return (self.pose.Exp() @ inputs).Log().tensor()
+
+        inputs = pp.randn_SE3(2, 2, dtype=torch.float64).to(device)
+        weight = torch.eye(6, device=device, dtype=torch.float64) + 0.1
+
+        for jac_dtype, info in [(torch.float32, None), (torch.bfloat16, None),
+                                (torch.bfloat16, weight)]:
+            invnet = PoseInv(2, 2).to(device)
+            optimizer = pp.optim.LM(invnet, weight=info, jac_dtype=jac_dtype)
+
+            for idx in range(10):
+                loss = optimizer.step(inputs)
+                print('Pose loss %.7f @ %dit'%(loss, idx))
+                assert optimizer.A.dtype == torch.float64
+                if loss < 1e-5:
+                    print('Early Stoping!')
+                    print('Optimization Early Done with loss:', loss.item())
+                    break
+
+            assert idx < 9, "Optimization requires too many steps."
+
+    def test_optim_cholesky_reuse(self):
+        torch.manual_seed(0)
+        J = torch.randn(400, 300, device=device, dtype=torch.float64)
+        A, b = J.T @ J, torch.randn(300, 1, device=device, dtype=torch.float64)
+        solver = ppos.Cholesky(reuse=True)
+        torch.testing.assert_close(solver(A, b), ppos.Cholesky()(A, b))
+        L = solver.L
+
+        A.diagonal().mul_(1.01) # changes slowly, the last factor is reused
+        x = solver(A, b)
+        assert solver.L is L, "The Cholesky factor is not reused."
+        # the iterative solution is only as accurate as the relative residual tolerance
+        assert torch.linalg.norm(A @ x - b) <= 2e-6 * torch.linalg.norm(b)
+        torch.testing.assert_close(x, ppos.Cholesky()(A, b), rtol=1e-3, atol=1e-6)
+
+        A.diagonal().mul_(2) # changes a lot, the matrix is factorized again
+        torch.testing.assert_close(solver(A, b), ppos.Cholesky()(A, b))
+        assert solver.L is not L, "The Cholesky factor is not updated."
+
+    def test_kernel_derivative(self):
+        kernels = [ppok.Huber(0.5), ppok.PseudoHuber(0.5), ppok.Cauchy(0.5), ppok.SoftLOne(0.5),
+                   ppok.Arctan(0.5), ppok.Tolerant(), ppok.Scale(0.5)]
+        x = torch.rand(100, 1, device=device, dtype=torch.float64).mul(4).requires_grad_(True)
+        for kernel in kernels:
+            grad = torch.autograd.grad(kernel(x).sum(), x)[0]
+            torch.testing.assert_close(kernel.derivative(x.detach()), grad)
+
 if __name__ == '__main__':
     test = TestOptim()
     test.test_optim_liealgebra()
@@ -291,4 +457,11 @@ if __name__ == '__main__':
     test.test_optim_strategy_adaptive()
     test.test_optim_trustregion()
     test.test_optim_multiparameter()
+    test.test_optim_flat_update()
     test.test_optim_anybatch()
+    test.test_optim_block_solver()
+    test.test_optim_streaming()
+    test.test_optim_gram()
+    test.test_optim_jac_dtype()
+    test.test_optim_cholesky_reuse()
+    test.test_kernel_derivative()